@@ -1,140 +1,752 @@
+import math
+from bisect import bisect_left
 import numpy as np 
+import pandas as pd
+import logging
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from typing import Dict, Tuple
-import math
+from typing import Callable, Dict, List, Optional, Tuple
+from config import RISK_PARAMS
 from fork_detector import ForkDetector
+from utils import NUMBA_AVAILABLE, njit
 
-@dataclass
-class LPToken:
-    """Tracks LP positions and pool state"""
-    pair: str                  # e.g. "ETH-USDC"
-    address: str               # Pool address
-    reserves: Tuple[float, float]  # (reserve0, reserve1)
-    total_supply: float = 0    # Total LP tokens minted
-    fee_accumulated: float = 0 # Collected fees in token0
+# Per-swap messages are DEBUG so tight simulation loops skip formatting them
+logger = logging.getLogger(__name__)
+
+# Exit reason codes written by the backtest kernel
+EXIT_SIGNAL = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+EXIT_REASONS = ('signal', 'stop_loss', 'take_profit')
+
+# Fixed-point scale (18 decimals, like ERC-20 wei) for integer LP square roots
+SCALE = 10**18
+
+def _lp_sqrt(amount0: float, amount1: float) -> float:
+    """floor(sqrt(amount0 * amount1)) in 18-decimal fixed point, as Uniswap V2's Math.sqrt mints"""
+    return math.isqrt(int(amount0 * SCALE) * int(amount1 * SCALE)) / SCALE
+
+@dataclass(frozen=True)
+class LPTokenView:
+    """Read-only view of one pool's state in an AMM's pool arrays"""
+    amm: 'AMM' = field(repr=False)
+    pool_id: int
+
+    @property
+    def pair(self) -> str:                        # e.g. "ETH-USDC"
+        return self.amm.pair_names[self.pool_id]
+
+    @property
+    def address(self) -> str:                     # Pool address
+        return self.amm.addresses[self.pool_id]
+
+    @property
+    def reserves(self) -> Tuple[float, float]:    # (reserve0, reserve1)
+        return float(self.amm._r0[self.pool_id]), float(self.amm._r1[self.pool_id])
+
+    @property
+    def total_supply(self) -> float:              # Total LP tokens minted
+        return float(self.amm._supply[self.pool_id])
+
+    @property
+    def fee_accumulated(self) -> float:           # Collected fees in token0
+        return float(self.amm._fee_acc[self.pool_id])
+
+    def __repr__(self) -> str:
+        return (f"LPTokenView(pair={self.pair!r}, address={self.address!r}, reserves={self.reserves!r}, "
+                f"total_supply={self.total_supply!r}, fee_accumulated={self.fee_accumulated!r})")
 
 class AMM:
     def __init__(self, fee: float = 0.003, gas_fee: float = 0.0001):
-        self.fee = fee          # 0.3% LP fee
+        self.fee = fee          # 0.3% LP fee (setter keeps _one_minus_fee in sync)
         self.gas_fee = gas_fee  # 0.01% network fee
-        self.pools: Dict[str, LPToken] = {}
+        # Pool state as parallel arrays indexed by pool id; strings stay on the cold path
+        self._r0 = np.zeros(0, dtype=np.float64)       # reserve0
+        self._r1 = np.zeros(0, dtype=np.float64)       # reserve1
+        self._supply = np.zeros(0, dtype=np.float64)   # Total LP tokens minted
+        self._fee_acc = np.zeros(0, dtype=np.float64)  # Collected fees in token0
+        self.pair_names: List[str] = []
+        self.addresses: List[str] = []
+        # (token_in, token_out) -> (pool_id, side); side 0 means token_in is token0.
+        # Both directions share one pool, so a swap writes a single reserves tuple.
+        self._pair_id: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    @property
+    def fee(self) -> float:
+        return self._fee
+
+    @fee.setter
+    def fee(self, value: float):
+        self._fee = value
+        self._one_minus_fee = 1.0 - value
+        self._swap_output = self._specialize(self._one_minus_fee)
+
+    @property
+    def gas_fee(self) -> float:
+        return self._gas_fee
+
+    @gas_fee.setter
+    def gas_fee(self, value: float):
+        self._gas_fee = value
+        self._one_minus_gas_fee = 1.0 - value
+
+    @staticmethod
+    def _specialize(one_minus_fee: float) -> Callable:
+        """Constant-product output (scalars or NumPy arrays) with 1 - fee bound in a closure; rebuilt whenever fee is set"""
+        def swap_output(amount_in, reserve_in, reserve_out):
+            amount_in_with_fee = amount_in * one_minus_fee
+            return (amount_in_with_fee * reserve_out) / (reserve_in + amount_in_with_fee)
+        return swap_output
+
+    def route(self, token_in: str, token_out: str) -> Tuple[int, int]:
+        """Resolve a directed token pair to (pool_id, side) once, for reuse with execute_route"""
+        key = self._pair_id.get((token_in, token_out))
+        if key is None:
+            raise ValueError(f"Pool {token_in}-{token_out} not found")
+        return key
+
+    @property
+    def num_pools(self) -> int:
+        return len(self.pair_names)
+
+    @property
+    def pools(self) -> List[LPTokenView]:
+        """Views of every pool, indexed by pool id"""
+        return [LPTokenView(self, pool_id) for pool_id in range(self.num_pools)]
+
+    def get_pool(self, token_a: str, token_b: str) -> LPTokenView:
+        """Pool for a token pair, in either order"""
+        return LPTokenView(self, self.route(token_a, token_b)[0])
+
+    def pool_id(self, token_a: str, token_b: str) -> int:
+        """Index of a token pair's pool in the pool arrays"""
+        return self.route(token_a, token_b)[0]
 
-    def execute_swap(self, token_in: str, token_out: str, amount_in: float) -> Tuple[float, LPToken]:
+    def simulate_batch(self, token_in: str, token_out: str, amounts_in: np.ndarray) -> np.ndarray:
+        """Quote many independent swaps against current reserves without executing them"""
+        pool_id, side = self.route(token_in, token_out)
+        reserve0, reserve1 = self._r0[pool_id], self._r1[pool_id]
+        reserve_in, reserve_out = (reserve0, reserve1) if side == 0 else (reserve1, reserve0)
+        amounts_in = np.asarray(amounts_in, dtype=np.float64)
+        return self._swap_output(amounts_in, reserve_in, reserve_out) * self._one_minus_gas_fee
+
+    def execute_swap(self, token_in: str, token_out: str, amount_in: float) -> Tuple[float, LPTokenView]:
         """Execute swap with atomic reserve updates"""
-        pair_name = f"{token_in}-{token_out}"
-        if pair_name not in self.pools:
-            raise ValueError(f"Pool {pair_name} not found")
+        pool_id, side = self.route(token_in, token_out)
+        return self.execute_route(pool_id, side, amount_in)
 
-        lp_token = self.pools[pair_name]
-        reserve_in, reserve_out = lp_token.reserves
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Copy of the mutable pool arrays, for restore()"""
+        return self._r0.copy(), self._r1.copy(), self._supply.copy(), self._fee_acc.copy()
 
-        # Calculate output with 0.3% fee
-        amount_in_with_fee = amount_in * (1 - self.fee)
-        amount_out = (amount_in_with_fee * reserve_out) / (reserve_in + amount_in_with_fee)
+    def restore(self, state: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]):
+        """Roll pool reserves, supply and fees back to a snapshot() (pools added since are not removed)"""
+        n = state[0].shape[0]
+        for current, saved in zip((self._r0, self._r1, self._supply, self._fee_acc), state):
+            current[:n] = saved
 
-        # Update reserves and track fees
-        lp_token.reserves = (
-            reserve_in + amount_in,
-            reserve_out - amount_out
-        )
-        lp_token.fee_accumulated += amount_in * self.fee
+    def execute_route(self, pool_id: int, side: int, amount_in: float) -> Tuple[float, LPTokenView]:
+        """execute_swap on an already-resolved route; no pair lookup"""
+        reserve0 = float(self._r0[pool_id])
+        reserve1 = float(self._r1[pool_id])
+        fee_amount = amount_in * self._fee
+
+        # Calculate output with 0.3% fee and update the pool's reserve slots
+        if side == 0:
+            amount_out = self._swap_output(amount_in, reserve0, reserve1)
+            self._r0[pool_id] = reserve0 + amount_in
+            self._r1[pool_id] = reserve1 - amount_out
+        else:
+            amount_out = self._swap_output(amount_in, reserve1, reserve0)
+            self._r0[pool_id] = reserve0 - amount_out
+            self._r1[pool_id] = reserve1 + amount_in
+            fee_amount *= reserve0 / reserve1  # Value token1 fees in token0
+
+        self._fee_acc[pool_id] += fee_amount
 
         # Apply gas fee
-        return amount_out * (1 - self.gas_fee), lp_token
-
-    def add_liquidity(self, token0: str, token1: str, amount0: float, amount1: float) -> LPToken:
-        """Add liquidity with proper LP token minting"""
-        pair_name = f"{token0}-{token1}"
-
-        if pair_name not in self.pools:
-            # Initial LP tokens = sqrt(amount0 * amount1)
-            initial_supply = math.sqrt(amount0 * amount1)
-            self.pools[pair_name] = LPToken(
-                pair=pair_name,
-                address=f"0x{pair_name[:8]}",
-                reserves=(amount0, amount1),
-                total_supply=initial_supply
-            )
-            return self.pools[pair_name]
+        return amount_out * self._one_minus_gas_fee, LPTokenView(self, pool_id)
+
+    @staticmethod
+    def _mint(amount0: float, amount1: float, reserve0: Optional[float] = None,
+              reserve1: Optional[float] = None, total_supply: float = 0.0) -> float:
+        """LP tokens minted for a deposit; first deposit when reserves are omitted"""
+        if reserve0 is None:
+            # A zero-reserve pool would make every later share ratio inf/NaN
+            if amount0 <= 0 or amount1 <= 0:
+                raise ValueError("Initial liquidity amounts must be positive")
+            # Initial LP tokens = sqrt(amount0 * amount1), integer sqrt like on-chain
+            return _lp_sqrt(amount0, amount1)
+        return float(min(amount0 / reserve0, amount1 / reserve1) * total_supply)
+
+    def _append_pool(self, pair_name: str, amount0: float, amount1: float, supply: float) -> int:
+        """Add a pool row, doubling array capacity when full; returns its id"""
+        pool_id = self.num_pools
+        if pool_id == self._r0.shape[0]:
+            grow = max(pool_id, 4)
+            self._r0, self._r1, self._supply, self._fee_acc = (
+                np.pad(a, (0, grow)) for a in (self._r0, self._r1, self._supply, self._fee_acc))
+        self._r0[pool_id] = amount0
+        self._r1[pool_id] = amount1
+        self._supply[pool_id] = supply
+        self.pair_names.append(pair_name)
+        self.addresses.append(f"0x{pair_name[:8]}")
+        return pool_id
+
+    def add_liquidity(self, token0: str, token1: str, amount0: float, amount1: float) -> Tuple[float, LPTokenView]:
+        """Add liquidity with proper LP token minting; returns (lp_minted, pool)"""
+        key = self._pair_id.get((token0, token1))
+
+        if key is None:
+            initial_supply = self._mint(amount0, amount1)
+            pool_id = self._append_pool(f"{token0}-{token1}", amount0, amount1, initial_supply)
+            self._pair_id[(token0, token1)] = (pool_id, 0)
+            self._pair_id[(token1, token0)] = (pool_id, 1)
+            return initial_supply, LPTokenView(self, pool_id)
+
+        pool_id, side = key
+        if side == 1:
+            amount0, amount1 = amount1, amount0
 
         # Calculate LP tokens based on share
-        reserve0, reserve1 = self.pools[pair_name].reserves
-        lp_amount = min(
-            amount0 / reserve0,
-            amount1 / reserve1
-        ) * self.pools[pair_name].total_supply
+        lp_amount = self._mint(amount0, amount1, self._r0[pool_id], self._r1[pool_id], self._supply[pool_id])
 
         # Update reserves
-        self.pools[pair_name].reserves = (
-            reserve0 + amount0,
-            reserve1 + amount1
-        )
-        self.pools[pair_name].total_supply += lp_amount
-        return self.pools[pair_name]
+        self._r0[pool_id] += amount0
+        self._r1[pool_id] += amount1
+        self._supply[pool_id] += lp_amount
+        return lp_amount, LPTokenView(self, pool_id)
 
 class DEXBacktester:
     def __init__(self):
         self.amm = AMM()
         self.fork_detector = ForkDetector()
-        self.user_balances: Dict[str, Dict[str, float]] = {}  # user -> {token: amount}
-        self.user_lp_positions: Dict[str, Dict[str, float]] = {}  # user -> {pool: lp_tokens}
+        # Balances and LP positions are dense matrices indexed by interned ids; their
+        # shapes are capacities (doubled when full), the id dicts hold the counts
+        self._user_id: Dict[str, int] = {}
+        self._token_id: Dict[str, int] = {}
+        self._bal = np.zeros((0, 0), dtype=np.float64)  # [user, token] -> amount
+        self._lp = np.zeros((0, 0), dtype=np.float64)   # [user, pool_id] -> lp_tokens
+
+    @staticmethod
+    def _intern(ids: Dict[str, int], key: str) -> int:
+        """Existing id for key, or the next free one"""
+        return ids.setdefault(key, len(ids))
+
+    @staticmethod
+    def _capacity(current: int, needed: int) -> int:
+        """current if it fits needed, else at least double it (like AMM._append_pool)"""
+        return current if needed <= current else max(needed, 2 * current, 4)
+
+    def _grow(self):
+        """Zero-pad the matrices once the user/token counts outgrow their capacity"""
+        n_users, n_tokens = len(self._user_id), len(self._token_id)
+        rows, cols = self._bal.shape
+        if n_users > rows or n_tokens > cols:
+            self._bal = np.pad(self._bal, ((0, self._capacity(rows, n_users) - rows),
+                                           (0, self._capacity(cols, n_tokens) - cols)))
+        rows = self._lp.shape[0]
+        if n_users > rows:
+            self._lp = np.pad(self._lp, ((0, self._capacity(rows, n_users) - rows), (0, 0)))
+
+    def _user_index(self, user: str) -> int:
+        """Id for user, adding a zero row to both matrices on first sight"""
+        uid = self._intern(self._user_id, user)
+        self._grow()
+        return uid
+
+    def _token_index(self, token: str) -> int:
+        """Id for token, adding a zero balance column on first sight"""
+        tid = self._intern(self._token_id, token)
+        self._grow()
+        return tid
+
+    def _balance(self, user: str, token: str) -> float:
+        uid = self._user_id.get(user)
+        tid = self._token_id.get(token)
+        return 0.0 if uid is None or tid is None else self._bal[uid, tid]
+
+    def _is_fork(self, pool_id: int) -> bool:
+        """Fork verdict for a pool; ForkDetector memoizes lookups and drops them on refresh()"""
+        return self.fork_detector.is_vampire_fork(self.amm.addresses[pool_id])
+
+    def clear_fork_cache(self):
+        """Re-read the detector's fork tables (after editing known_forks/known_genuine directly)"""
+        self.fork_detector.refresh()
+
+    def add_known_fork(self, prefix: str, name: str, original_protocol: str, risk_score: float):
+        """Flag a pool address prefix as a fork; applies to pools already checked too"""
+        self.fork_detector.add_known_fork(prefix, name, original_protocol, risk_score)
+
+    def deposit(self, user: str, token: str, amount: float):
+        """Credit a user's token balance"""
+        uid = self._user_index(user)
+        tid = self._token_index(token)  # May grow self._bal, so resolve before indexing
+        self._bal[uid, tid] += amount
+
+    def deposit_batch(self, users, tokens, amounts):
+        """Credit many (user, token, amount) rows with one scatter-add; grows the matrix once"""
+        uids = np.array([self._intern(self._user_id, u) for u in users], dtype=np.int64)
+        tids = np.array([self._intern(self._token_id, t) for t in tokens], dtype=np.int64)
+        self._grow()
+        np.add.at(self._bal, (uids, tids), np.asarray(amounts, dtype=np.float64))
+
+    def get_balances(self, user: str) -> Dict[str, float]:
+        """Token balances for user as {token: amount}"""
+        uid = self._user_id.get(user)
+        if uid is None:
+            return {}
+        return {token: float(self._bal[uid, tid]) for token, tid in self._token_id.items()}
+
+    def get_lp_positions(self, user: str) -> Dict[str, float]:
+        """LP holdings for user as {pair: lp_tokens}"""
+        uid = self._user_id.get(user)
+        if uid is None:
+            return {}
+        return {self.amm.pair_names[pid]: float(amount)
+                for pid, amount in enumerate(self._lp[uid, :self.amm.num_pools]) if amount > 0}
 
     def safe_swap(self, user: str, token_in: str, token_out: str, amount_in: float) -> float:
         """Secure swap with fork detection"""
         # 1. Check balances
-        if self.user_balances.get(user, {}).get(token_in, 0) < amount_in:
+        uid = self._user_id.get(user)
+        tid_in = self._token_id.get(token_in)
+        balance = 0.0 if uid is None or tid_in is None else self._bal[uid, tid_in]
+        if balance < amount_in:
             raise ValueError(f"Insufficient {token_in} balance")
 
-        # 2. Check for forks
-        pool_address = self.amm.pools[f"{token_in}-{token_out}"].address
-        if self.fork_detector.is_vampire_fork(pool_address):
+        # 2. Check for forks (resolve the pair once; the swap reuses the route)
+        pool_id, side = self.amm.route(token_in, token_out)
+        if self._is_fork(pool_id):
             raise ValueError(f"Security Alert: {token_in}-{token_out} pool is a fork")
 
         # 3. Execute swap
-        amount_out, updated_pool = self.amm.execute_swap(token_in, token_out, amount_in)
+        amount_out, updated_pool = self.amm.execute_route(pool_id, side, amount_in)
 
-        # 4. Update balances
-        if user not in self.user_balances:
-            self.user_balances[user] = {}
-        self.user_balances[user][token_in] = self.user_balances[user].get(token_in, 0) - amount_in
-        self.user_balances[user][token_out] = self.user_balances[user].get(token_out, 0) + amount_out
+        # 4. Update balances (intern only on first sight; each may grow self._bal)
+        tid_out = self._token_id.get(token_out)
+        if uid is None or tid_in is None or tid_out is None:
+            uid = self._user_index(user)
+            tid_in = self._token_index(token_in)
+            tid_out = self._token_index(token_out)
+        self._bal[uid, tid_in] -= amount_in
+        self._bal[uid, tid_out] += amount_out
 
-        print(f"✅ {user} swapped {amount_in} {token_in} → {amount_out:.2f} {token_out}")
-        print(f"   New reserves: {updated_pool.reserves}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ %s swapped %s %s → %.2f %s", user, amount_in, token_in, amount_out, token_out)
+            logger.debug("   New reserves: %s", updated_pool.reserves)
         return amount_out
 
+    def safe_swap_batch(self, users, tokens_in, tokens_out, amounts) -> np.ndarray:
+        """Replay many swaps in order, as repeated safe_swap calls would; each pool is routed and
+        fork-checked once and balances are written back in one step. All-or-nothing: if any swap
+        fails its balance check, pool state is rolled back and no balances change."""
+        users, tokens_in, tokens_out = list(users), list(tokens_in), list(tokens_out)
+        amounts_in = np.asarray(amounts, dtype=np.float64).ravel().tolist()
+        lengths = {len(users), len(tokens_in), len(tokens_out), len(amounts_in)}
+        if len(lengths) > 1:
+            raise ValueError(f"users, tokens_in, tokens_out and amounts differ in length: "
+                             f"{len(users)}, {len(tokens_in)}, {len(tokens_out)}, {len(amounts_in)}")
+        pairs = list(zip(tokens_in, tokens_out))
+
+        # 1. Resolve and fork-check each distinct pair once
+        routes: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for pair in dict.fromkeys(pairs):
+            pool_id, side = routes[pair] = self.amm.route(*pair)
+            if self._is_fork(pool_id):
+                raise ValueError(f"Security Alert: {pair[0]}-{pair[1]} pool is a fork")
+
+        # 2. Execute swaps sequentially, since each one moves the reserves the next sees;
+        #    running balances let a swap spend tokens an earlier one in the batch received
+        held: Dict[Tuple[str, str], float] = {}
+        execute_route = self.amm.execute_route
+        checkpoint = self.amm.snapshot()
+        amounts_out = np.empty(len(pairs), dtype=np.float64)
+        for i, (user, pair, amount_in) in enumerate(zip(users, pairs, amounts_in)):
+            token_in, token_out = pair
+            key_in, key_out = (user, token_in), (user, token_out)
+            balance_in = held.get(key_in)
+            if balance_in is None:
+                balance_in = self._balance(user, token_in)
+            if balance_in < amount_in:
+                self.amm.restore(checkpoint)
+                raise ValueError(f"Insufficient {token_in} balance")
+            amount_out = amounts_out[i] = execute_route(*routes[pair], amount_in)[0]
+            held[key_in] = balance_in - amount_in
+            held[key_out] = held.get(key_out, self._balance(user, token_out)) + amount_out
+
+        # 3. Write final balances (new users/tokens are only interned once every swap succeeded)
+        uids = [self._intern(self._user_id, user) for user, _ in held]
+        tids = [self._intern(self._token_id, token) for _, token in held]
+        self._grow()
+        self._bal[uids, tids] = list(held.values())
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ Replayed %d swaps across %d pools", len(pairs), len(routes))
+        return amounts_out
+
     def provide_liquidity(self, user: str, token0: str, token1: str, amount0: float, amount1: float):
         """Add liquidity with full LP tracking"""
         # 1. Check balances
-        if self.user_balances.get(user, {}).get(token0, 0) < amount0 or \
-           self.user_balances.get(user, {}).get(token1, 0) < amount1:
+        if self._balance(user, token0) < amount0 or self._balance(user, token1) < amount1:
             raise ValueError("Insufficient token balance")
 
         # 2. Add liquidity
-        lp_token = self.amm.add_liquidity(token0, token1, amount0, amount1)
+        lp_amount, lp_token = self.amm.add_liquidity(token0, token1, amount0, amount1)
 
         # 3. Update user balances
-        if user not in self.user_balances:
-            self.user_balances[user] = {}
-        self.user_balances[user][token0] -= amount0
-        self.user_balances[user][token1] -= amount1
+        uid = self._user_index(user)
+        tid0 = self._token_index(token0)
+        tid1 = self._token_index(token1)  # Resolve every id first; each may grow self._bal
+        self._bal[uid, tid0] -= amount0
+        self._bal[uid, tid1] -= amount1
 
         # 4. Track LP tokens
-        if user not in self.user_lp_positions:
-            self.user_lp_positions[user] = {}
-        lp_amount = math.sqrt(amount0 * amount1) if lp_token.total_supply == 0 else \
-                   min(amount0/lp_token.reserves[0], amount1/lp_token.reserves[1]) * lp_token.total_supply
-        self.user_lp_positions[user][lp_token.pair] = self.user_lp_positions[user].get(lp_token.pair, 0) + lp_amount
+        pool_id = self.amm.pool_id(token0, token1)
+        cols = self._lp.shape[1]
+        if pool_id >= cols:
+            self._lp = np.pad(self._lp, ((0, 0), (0, self._capacity(cols, pool_id + 1) - cols)))
+        self._lp[uid, pool_id] += lp_amount
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("💰 %s added %s %s + %s %s", user, amount0, token0, amount1, token1)
+            logger.debug("   Received %.2f %s LP tokens", lp_amount, lp_token.pair)
+
+@dataclass
+class Trade:
+    """Closed long trade produced by Backtester"""
+    entry_time: object
+    exit_time: object
+    entry_price: float
+    exit_price: float
+    size: float                # Units held
+    fees: float                # Entry + exit fees
+    pnl: float                 # Net of fees
+    exit_reason: str           # 'signal', 'stop_loss' or 'take_profit'
+
+class TradeLog(Sequence):
+    """Columnar view of closed trades; Trade records are materialized on access"""
+    def __init__(self, entry_time: np.ndarray, exit_time: np.ndarray, entry_price: np.ndarray,
+                 exit_price: np.ndarray, size: np.ndarray, fees: np.ndarray, pnl: np.ndarray,
+                 exit_reason: np.ndarray):
+        self.entry_time = entry_time
+        self.exit_time = exit_time
+        self.entry_price = entry_price
+        self.exit_price = exit_price
+        self.size = size
+        self.fees = fees
+        self.pnl = pnl
+        self.exit_reason = exit_reason  # EXIT_* codes
+
+    def __len__(self) -> int:
+        return len(self.pnl)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return Trade(
+            entry_time=self.entry_time[i],
+            exit_time=self.exit_time[i],
+            entry_price=float(self.entry_price[i]),
+            exit_price=float(self.exit_price[i]),
+            size=float(self.size[i]),
+            fees=float(self.fees[i]),
+            pnl=float(self.pnl[i]),
+            exit_reason=EXIT_REASONS[self.exit_reason[i]]
+        )
+
+    def __repr__(self) -> str:
+        return f"TradeLog({len(self)} trades)"
+
+    def to_frame(self) -> pd.DataFrame:
+        """One DataFrame built straight from the columns, no per-trade objects"""
+        return pd.DataFrame({
+            'entry_time': self.entry_time,
+            'exit_time': self.exit_time,
+            'entry_price': self.entry_price,
+            'exit_price': self.exit_price,
+            'size': self.size,
+            'fees': self.fees,
+            'pnl': self.pnl,
+            'exit_reason': pd.Categorical.from_codes(self.exit_reason, categories=EXIT_REASONS)
+        })
+
+@njit(cache=True)
+def _run_backtest_core(prices, signals, initial_capital, fee_rate, stop_loss, take_profit, position_size):
+    """Sequential long-only backtest over raw arrays; returns per-trade columns and equity"""
+    n = prices.shape[0]
+    equity = np.empty(n, np.float64)
+    entry_idx = np.empty(n, np.int64)
+    exit_idx = np.empty(n, np.int64)
+    entry_price = np.empty(n, np.float64)
+    exit_price = np.empty(n, np.float64)
+    size = np.empty(n, np.float64)
+    fees = np.empty(n, np.float64)
+    pnl = np.empty(n, np.float64)
+    reason = np.empty(n, np.int8)
+
+    portfolio = initial_capital
+    position = 0.0
+    cost = 0.0
+    entry_fee = 0.0
+    stop_price = 0.0
+    target_price = 0.0
+    k = 0
+    for i in range(n):
+        price = prices[i]
+        if position > 0.0:
+            exit_code = -1
+            if price <= stop_price:
+                exit_code = EXIT_STOP_LOSS
+            elif price >= target_price:
+                exit_code = EXIT_TAKE_PROFIT
+            elif signals[i] == -1:
+                exit_code = EXIT_SIGNAL
+
+            if exit_code >= 0:
+                proceeds = position * price
+                exit_fee = proceeds * fee_rate
+                portfolio += proceeds - exit_fee
+                exit_idx[k] = i
+                exit_price[k] = price
+                size[k] = position
+                fees[k] = entry_fee + exit_fee
+                pnl[k] = proceeds - exit_fee - cost
+                reason[k] = exit_code
+                k += 1
+                position = 0.0
+        elif signals[i] == 1 and portfolio > 0.0:
+            cost = portfolio * position_size
+            entry_fee = cost * fee_rate
+            position = (cost - entry_fee) / price
+            portfolio -= cost
+            entry_idx[k] = i
+            entry_price[k] = price
+            # Exit thresholds are fixed for the life of the trade
+            stop_price = price * (1.0 - stop_loss)
+            target_price = price * (1.0 + take_profit)
+
+        equity[i] = portfolio + position * price
+
+    return (entry_idx[:k], exit_idx[:k], entry_price[:k], exit_price[:k],
+            size[:k], fees[:k], pnl[:k], reason[:k], equity)
+
+def _first_breach(prices, start, stop, stop_price, target_price, chunk=16):
+    """First bar in prices[start:stop] at or beyond either barrier, else -1.
+
+    Scans in doubling chunks so an early stop-loss/take-profit exit costs
+    O(bars held), not O(bars until the next sell signal).
+    """
+    while start < stop:
+        window = prices[start:min(start + chunk, stop)]
+        breach = (window <= stop_price) | (window >= target_price)
+        if breach.any():
+            return start + int(np.argmax(breach))
+        start += window.shape[0]
+        chunk *= 2
+    return -1
+
+def _run_backtest_vectorized(prices, signals, initial_capital, fee_rate, stop_loss, take_profit, position_size):
+    """NumPy equivalent of _run_backtest_core for when Numba is unavailable.
+
+    Trade timing does not depend on the balance, so it is found first: each
+    exit is a chunked mask scan over the bars up to the next sell signal
+    (the first stop-loss or take-profit breach wins, otherwise the sell
+    signal closes the trade). Only the (few) trades are iterated in Python. Balances then
+    telescope: each closed trade scales the portfolio by
+    1 + position_size * ((1 - fee)^2 * exit/entry - 1), so one cumprod gives
+    the cash after every trade.
+    """
+    n = prices.shape[0]
+    # Plain lists: bisect and scalar indexing beat their NumPy forms per trade
+    buy_idx = np.flatnonzero(signals == 1).tolist()
+    sell_idx = np.flatnonzero(signals == -1).tolist()
+    entries, exits, reasons = [], [], []
+    open_entry = -1  # Entry bar of a position still open at the last bar
 
-        print(f"💰 {user} added {amount0} {token0} + {amount1} {token1}")
-        print(f"   Received {lp_amount:.2f} {lp_token.pair} LP tokens")
+    first_entry = 0  # No re-entry on the bar that closed the last trade
+    while initial_capital > 0.0:
+        b = bisect_left(buy_idx, first_entry)
+        if b == len(buy_idx):
+            break
+        e = buy_idx[b]
+        price = float(prices[e])
+
+        # Candidate window ends at the next sell signal (inclusive)
+        s = bisect_left(sell_idx, e + 1)
+        end = sell_idx[s] if s < len(sell_idx) else n - 1
+        stop_price = price * (1.0 - stop_loss)
+        target_price = price * (1.0 + take_profit)
+        x = _first_breach(prices, e + 1, end + 1, stop_price, target_price)
+        if x >= 0:
+            code = EXIT_STOP_LOSS if prices[x] <= stop_price else EXIT_TAKE_PROFIT
+        elif s < len(sell_idx):
+            x = end
+            code = EXIT_SIGNAL
+        else:
+            open_entry = e
+            break
+
+        entries.append(e)
+        exits.append(x)
+        reasons.append(code)
+        first_entry = x + 1
+
+    entry_idx = np.array(entries, np.int64)
+    exit_idx = np.array(exits, np.int64)
+    entry_price = prices[entry_idx]
+    exit_price = prices[exit_idx]
+
+    # Cash threaded through all closed trades at once
+    keep = 1.0 - fee_rate
+    growth = 1.0 + position_size * (keep * keep * exit_price / entry_price - 1.0)
+    cash_after = initial_capital * np.cumprod(growth)
+    cash_before = np.concatenate(([initial_capital], cash_after[:-1]))
+    cost = cash_before * position_size
+    entry_fee = cost * fee_rate
+    size = (cost - entry_fee) / entry_price
+    proceeds = size * exit_price
+    exit_fee = proceeds * fee_rate
+    fees = entry_fee + exit_fee
+    pnl = proceeds - exit_fee - cost
+
+    # Equity: step-wise cash plus marked-to-market holdings
+    cash = np.empty(n, np.float64)
+    held = np.zeros(n, np.float64)
+    cursor = 0
+    for e, x, before, spent, units in zip(entries, exits, cash_before.tolist(), cost.tolist(), size.tolist()):
+        cash[cursor:e] = before
+        cash[e:x] = before - spent
+        held[e:x] = units
+        cursor = x
+    final_cash = cash_after[-1] if cash_after.shape[0] else initial_capital
+    if open_entry >= 0:
+        open_cost = final_cash * position_size
+        cash[cursor:open_entry] = final_cash
+        cash[open_entry:] = final_cash - open_cost
+        held[open_entry:] = (open_cost - open_cost * fee_rate) / prices[open_entry]
+    else:
+        cash[cursor:] = final_cash
+    equity = cash + held * prices
+
+    return (entry_idx, exit_idx, entry_price, exit_price,
+            size, fees, pnl, np.array(reasons, np.int8), equity)
+
+class Backtester:
+    def __init__(self, data: pd.DataFrame, strategy: Callable[[pd.DataFrame], pd.Series],
+                 initial_capital: float = 10000.0, fee_rate: float = 0.001,
+                 stop_loss: float = RISK_PARAMS['stop_loss_pct'],
+                 take_profit: float = RISK_PARAMS['take_profit_pct'],
+                 position_size: float = RISK_PARAMS['max_position_size'],
+                 price_column: str = 'close', signals: Optional[pd.Series] = None):
+        self.data = data
+        self.strategy = strategy          # data -> Series of 1 (buy), -1 (sell), 0 (hold)
+        self.initial_capital = initial_capital
+        self.fee_rate = fee_rate          # 0.1% per side
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.position_size = position_size  # Fraction of portfolio per entry
+        self.price_column = price_column
+        # Strategy output, computed on the first run unless passed in; lets a
+        # stop-loss/take-profit sweep share one signal pass across runs.
+        # Reassigning data or strategy drops it.
+        self.signals = signals
+
+    @property
+    def data(self) -> pd.DataFrame:
+        return self._data
+
+    @data.setter
+    def data(self, value: pd.DataFrame):
+        self._data = value
+        self.signals = None
+
+    @property
+    def strategy(self) -> Callable[[pd.DataFrame], pd.Series]:
+        return self._strategy
+
+    @strategy.setter
+    def strategy(self, value: Callable[[pd.DataFrame], pd.Series]):
+        self._strategy = value
+        self.signals = None
+
+    def run_backtest(self) -> Dict:
+        """Run strategy signals through the backtest kernel"""
+        prices = self.data[self.price_column].to_numpy(np.float64)
+        if self.signals is None:
+            self.signals = self.strategy(self.data)
+        signals = self.signals
+        if isinstance(signals, pd.Series):
+            # Align on the frame's index; bars without a signal hold (0)
+            signals = signals.reindex(self.data.index, fill_value=0)
+        signals = np.asarray(signals, dtype=np.int8)
+        if signals.shape != prices.shape:
+            # The Numba kernel does no bounds checks, so a short array would read past its end
+            raise ValueError(f"Got {len(signals)} signals for {len(prices)} price bars")
+
+        # Compiled per-bar loop when Numba is present, per-trade masks otherwise
+        run_core = _run_backtest_core if NUMBA_AVAILABLE else _run_backtest_vectorized
+        (entry_idx, exit_idx, entry_prices, exit_prices,
+         sizes, fees, pnls, reasons, equity) = run_core(
+            prices, signals, float(self.initial_capital), float(self.fee_rate),
+            float(self.stop_loss), float(self.take_profit), float(self.position_size)
+        )
+
+        # Keep the kernel's columns; Trade objects are only built when indexed
+        times = self._timestamps()
+        trades = TradeLog(
+            entry_time=times[entry_idx],
+            exit_time=times[exit_idx],
+            entry_price=entry_prices,
+            exit_price=exit_prices,
+            size=sizes,
+            fees=fees,
+            pnl=pnls,
+            exit_reason=reasons
+        )
+
+        return {
+            'trades': trades,
+            'equity_curve': equity,
+            'metrics': self._calculate_metrics(trades, equity)
+        }
+
+    def _timestamps(self) -> np.ndarray:
+        """Bar timestamps from a 'timestamp'/'date' column, else the index"""
+        for col in ('timestamp', 'date'):
+            if col in self.data.columns:
+                return self.data[col].to_numpy()
+        return self.data.index.to_numpy()
+
+    def _calculate_metrics(self, trades: TradeLog, equity_curve: np.ndarray) -> Dict[str, float]:
+        """Summary statistics as column reductions over the trade log"""
+        if len(equity_curve) == 0:
+            return {'final_value': self.initial_capital, 'total_return_pct': 0.0, 'num_trades': 0,
+                    'win_rate_pct': 0.0, 'total_fees': 0.0, 'max_drawdown_pct': 0.0}
+
+        rolling_max = np.maximum.accumulate(equity_curve)
+        drawdown = (equity_curve - rolling_max) / rolling_max
+        final_value = float(equity_curve[-1])
+        num_trades = len(trades)
+
+        return {
+            'final_value': round(final_value, 2),
+            'total_return_pct': round((final_value / self.initial_capital - 1) * 100, 2),
+            'num_trades': num_trades,
+            'win_rate_pct': round(float((trades.pnl > 0).mean()) * 100, 2) if num_trades else 0.0,
+            'total_fees': round(float(trades.fees.sum()), 2),
+            'max_drawdown_pct': round(float(drawdown.min()) * 100, 2)
+        }
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+
     # Initialize backtester
     dex = DEXBacktester()
     
     # Setup test user
-    dex.user_balances["alice"] = {"ETH": 100, "USDC": 50000}
+    dex.deposit("alice", "ETH", 100)
+    dex.deposit("alice", "USDC", 50000)
     
     print("===== DEX Backtester =====")
     
@@ -151,6 +763,6 @@ if __name__ == "__main__":
     
     # 3. Show final state
     print("\n[Final State]")
-    print("Alice balances:", {k: round(v, 2) for k, v in dex.user_balances["alice"].items() if v > 0})
-    print("Alice LP positions:", {k: round(v, 2) for k, v in dex.user_lp_positions["alice"].items()})
-    print("ETH-USDC pool reserves:", dex.amm.pools["ETH-USDC"].reserves)
\ No newline at end of file
+    print("Alice balances:", {k: round(v, 2) for k, v in dex.get_balances("alice").items() if v > 0})
+    print("Alice LP positions:", {k: round(v, 2) for k, v in dex.get_lp_positions("alice").items()})
+    print("ETH-USDC pool reserves:", dex.amm.get_pool("ETH", "USDC").reserves)
\ No newline at end of file
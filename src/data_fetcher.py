@@ -1,7 +1,26 @@
 import os
 import sys
+import asyncio
+import numpy as np
 import pandas as pd
 import ccxt
+import ccxt.async_support as ccxt_async
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+def _ohlcv_frame(ohlcv) -> pd.DataFrame:
+    """Raw exchange candles -> DataFrame with datetime timestamps and full-precision prices"""
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """float32 copy of the OHLCV columns for the in-memory frame; save CSVs before this"""
+    # float32 halves the frame; indicators upcast close to float64 where needed
+    return df.astype({col: np.float32 for col in OHLCV_COLUMNS[1:]})
+
+def _data_path(data_dir: str, symbol: str, timeframe: str) -> str:
+    return os.path.join(data_dir, f'{symbol.replace("/", "-")}_{timeframe}.csv')
 
 def get_crypto_data(symbol='BTC/USDT', timeframe='1d', limit=100):
     """Debug version with verbose output"""
@@ -25,11 +44,11 @@ def get_crypto_data(symbol='BTC/USDT', timeframe='1d', limit=100):
 
         # 4. Process and save data
         print("[4/4] Processing data...")
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df = _ohlcv_frame(ohlcv)
         
-        filename = os.path.join(data_dir, f'{symbol.replace("/", "-")}_{timeframe}.csv')
+        filename = _data_path(data_dir, symbol, timeframe)
         df.to_csv(filename, index=False)
+        df = _downcast(df)
         print(f"✓ Data saved to:\n{os.path.abspath(filename)}")
         print(df.head(3))  # Show sample data
         
@@ -41,6 +60,41 @@ def get_crypto_data(symbol='BTC/USDT', timeframe='1d', limit=100):
         traceback.print_exc()
         return None
 
+async def _fetch_one(exchange, symbol, timeframe, limit):
+    ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+    df = _ohlcv_frame(ohlcv)
+    df['symbol'] = symbol
+    df['timeframe'] = timeframe
+    return df
+
+async def _fetch_all(pairs, limit):
+    exchange = ccxt_async.binance({'timeout': 10000, 'enableRateLimit': True})
+    try:
+        return await asyncio.gather(*[_fetch_one(exchange, s, tf, limit) for s, tf in pairs])
+    finally:
+        await exchange.close()
+
+def fetch_many(pairs, limit=100):
+    """Fetch several (symbol, timeframe) pairs concurrently into one long DataFrame"""
+    try:
+        print(f"\n=== Fetching {len(pairs)} series concurrently ===")
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        os.makedirs(data_dir, exist_ok=True)
+
+        # Requests overlap on one async client; wall time ~ the slowest series
+        frames = asyncio.run(_fetch_all(pairs, limit))
+        for (symbol, timeframe), df in zip(pairs, frames):
+            df.drop(columns=['symbol', 'timeframe']).to_csv(_data_path(data_dir, symbol, timeframe), index=False)
+            print(f"✓ {symbol} {timeframe}: {len(df)} candles")
+
+        return pd.concat([_downcast(df) for df in frames], ignore_index=True)
+
+    except Exception as e:
+        print(f"\n⚠️ Critical Error ⚠️\n{str(e)}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return None
+
 if __name__ == "__main__":
     print("\n🚀 Running Crypto Data Fetcher 🚀")
     data = get_crypto_data()
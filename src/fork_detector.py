@@ -3,7 +3,7 @@ from typing import Dict, Optional
 from dataclasses import dataclass
 import time
 
-@dataclass
+@dataclass(frozen=True)  # Shared by query_pool's cache, so callers must not mutate it
 class PoolMetadata:
     name: str
     is_fork: bool
@@ -19,35 +19,65 @@ class ForkDetector:
             "0xc35dad": ("QuickSwap", "Uniswap V2", 0.7)
         }
         self.headers = {"User-Agent": "DEXSecurityScanner/1.0"}
+        self.known_genuine = {
+            # Format: {"pool_address_prefix": ("protocol_name", is_fork, risk_score)}
+            "0xb4e16d": ("Uniswap V2", False, 0.0),
+            "0x0d4a11": ("Uniswap V2", False, 0.0)
+        }
+        self._query_cache: Dict[str, PoolMetadata] = {}  # Normalized address -> result
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the prefix trie and drop cached lookups; call after editing known_forks/known_genuine"""
+        self._prefix_trie = self._build_trie()
+        self._query_cache.clear()
+
+    def add_known_fork(self, prefix: str, name: str, original_protocol: str, risk_score: float):
+        """Register a fork address prefix; takes effect on the next query"""
+        self.known_forks[prefix] = (name, original_protocol, risk_score)
+        self.refresh()
+
+    def add_known_genuine(self, prefix: str, name: str, risk_score: float = 0.0):
+        """Register a genuine pool address prefix; takes effect on the next query"""
+        self.known_genuine[prefix] = (name, False, risk_score)
+        self.refresh()
+
+    def _build_trie(self) -> dict:
+        """Nested {char: node} dict; a node's None key holds PoolMetadata kwargs for a prefix ending there"""
+        trie: dict = {}
+        entries = [(prefix, dict(name=name, is_fork=is_fork, risk_score=score))
+                   for prefix, (name, is_fork, score) in self.known_genuine.items()]
+        # Forks go in last so they win over a genuine entry with the same prefix
+        entries += [(prefix, dict(name=name, is_fork=True, original_protocol=original, risk_score=score))
+                    for prefix, (name, original, score) in self.known_forks.items()]
+        for prefix, payload in entries:
+            node = trie
+            for char in prefix.lower():
+                node = node.setdefault(char, {})
+            node[None] = payload
+        return trie
 
     def query_pool(self, pool_address: str) -> PoolMetadata:
         """Deterministic fork detection without external APIs"""
         # Normalize address
         address = pool_address.lower()
-        
-        # Method 1: Check against known fork prefixes
-        for prefix, (name, original, score) in self.known_forks.items():
-            if address.startswith(prefix):
-                return PoolMetadata(
-                    name=name,
-                    is_fork=True,
-                    original_protocol=original,
-                    risk_score=score
-                )
-        
-        # Method 2: Check common genuine pools
-        known_genuine = {
-            "0xb4e16d": ("Uniswap V2", False, 0.0),
-            "0x0d4a11": ("Uniswap V2", False, 0.0)
-        }
-        for prefix, (name, is_fork, score) in known_genuine.items():
-            if address.startswith(prefix):
-                return PoolMetadata(
-                    name=name,
-                    is_fork=is_fork,
-                    risk_score=score
-                )
-        
+        cached = self._query_cache.get(address)
+        if cached is None:
+            cached = self._query_cache[address] = self._classify(address)
+        return cached
+
+    def _classify(self, address: str) -> PoolMetadata:
+        """Uncached query_pool body for a lowercased address"""
+        # Methods 1-2: Longest known fork / genuine prefix, one trie walk
+        node, match = self._prefix_trie, None
+        for char in address:
+            node = node.get(char)
+            if node is None:
+                break
+            match = node.get(None, match)
+        if match is not None:
+            return PoolMetadata(**match)
+
         # Method 3: Heuristic check (all other pools medium risk)
         return PoolMetadata(
             name="unknown",
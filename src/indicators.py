@@ -1,7 +1,15 @@
+import logging
+import numpy as np
 import pandas as pd
 import talib
+from utils import rolling_mean
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# Output columns, in block order
+INDICATOR_COLUMNS = ['rsi', 'macd', 'macd_signal', 'upper_band', 'middle_band', 'lower_band', 'sma_50']
+
 def calculate_indicators(df: pd.DataFrame) -> Optional[pd.DataFrame]:
     """
     Calculate technical indicators for cryptocurrency data.
@@ -13,45 +21,57 @@ def calculate_indicators(df: pd.DataFrame) -> Optional[pd.DataFrame]:
         DataFrame with added indicator columns or None if error occurs
     """
     try:
-        print("\n🔮 Calculating indicators...")
+        logger.debug("🔮 Calculating indicators...")
+        
+        # TA-Lib needs float64; convert once even if the frame holds float32 prices
+        close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+        
+        # One column-major block for all outputs, so each indicator writes a contiguous column
+        block = np.empty((close.shape[0], len(INDICATOR_COLUMNS)), dtype=np.float64, order='F')
         
         # 1. Relative Strength Index (RSI)
-        df['rsi'] = talib.RSI(df['close'], timeperiod=14)
-        print("✓ RSI (14-period) added")
+        block[:, 0] = talib.RSI(close, timeperiod=14)
+        logger.debug("✓ RSI (14-period) added")
         
         # 2. Moving Average Convergence Divergence (MACD)
-        df['macd'], df['signal'], _ = talib.MACD(
-            df['close'], 
+        block[:, 1], block[:, 2], _ = talib.MACD(
+            close, 
             fastperiod=12, 
             slowperiod=26, 
             signalperiod=9
         )
-        print("✓ MACD (12,26,9) added")
+        logger.debug("✓ MACD (12,26,9) added")
         
         # 3. Bollinger Bands
-        df['upper_band'], df['middle_band'], df['lower_band'] = talib.BBANDS(
-            df['close'],
+        block[:, 3], block[:, 4], block[:, 5] = talib.BBANDS(
+            close,
             timeperiod=20,
             nbdevup=2,
             nbdevdn=2
         )
-        print("✓ Bollinger Bands (20,2) added")
+        logger.debug("✓ Bollinger Bands (20,2) added")
+        
+        # 4. Simple Moving Average (utils.rolling_mean; same NaN warm-up as talib.SMA)
+        block[:, 6] = rolling_mean(close, 50)
+        logger.debug("✓ 50-day SMA added")
         
-        # 4. Simple Moving Average
-        df['sma_50'] = talib.SMA(df['close'], timeperiod=50)
-        print("✓ 50-day SMA added")
+        # Attach the block in one concat; drop stale copies so reruns don't duplicate columns
+        indicators = pd.DataFrame(block, columns=INDICATOR_COLUMNS, index=df.index)
+        df = pd.concat([df.drop(columns=INDICATOR_COLUMNS, errors='ignore'), indicators], axis=1)
         
-        print("✅ All indicators calculated successfully")
+        logger.debug("✅ All indicators calculated successfully")
         return df
         
     except Exception as e:
-        print(f"❌ Error calculating indicators: {e}")
+        logger.error("❌ Error calculating indicators: %s", e)
         return None
 
 # Test function
 if __name__ == "__main__":
     from data_fetcher import get_crypto_data
     
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+
     print("\n🧪 Testing indicators...")
     test_data = get_crypto_data(limit=30)  # Small sample for testing
     if test_data is not None:
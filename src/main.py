@@ -4,6 +4,11 @@ import logging
 from backtester import Backtester
 from strategies import moving_average_crossover
 from reporting import generate_report
+from utils import PYARROW_AVAILABLE
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
 
 # Configure logging
 logging.basicConfig(
@@ -12,13 +17,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def load_data(path: str) -> pd.DataFrame:
+    """Read a price CSV with Arrow's multithreaded parser when available, else pandas"""
+    if PYARROW_AVAILABLE:
+        # Arrow infers date/timestamp columns that pd.read_csv leaves as text;
+        # read those as strings so both paths return the same dtypes, and let
+        # empty string cells be null the way pandas reads them as NaN
+        with pacsv.open_csv(path) as reader:
+            schema = reader.schema
+        as_text = {f.name: pa.string() for f in schema if pa.types.is_temporal(f.type)}
+        convert = pacsv.ConvertOptions(column_types=as_text, strings_can_be_null=True)
+        return pacsv.read_csv(path, convert_options=convert).to_pandas()
+    return pd.read_csv(path)
+
 def main():
     try:
         logger.info("Starting backtest...")
         
         # 1. Load data
-        data = pd.read_csv("data.csv")
-        logger.info(f"Data loaded successfully. Shape: {data.shape}")
+        data = load_data("data.csv")
+        logger.info("Data loaded successfully. Shape: %s", data.shape)
         
         # 2. Initialize backtester
         backtester = Backtester(
@@ -44,7 +62,7 @@ def main():
             print(f"{k:>20}: {v}")
             
     except Exception as e:
-        logger.error(f"Backtest failed: {str(e)}", exc_info=True)
+        logger.error("Backtest failed: %s", e, exc_info=True)
         return
 
 if __name__ == "__main__":
@@ -1,34 +1,93 @@
 # reporting.py
+import dataclasses
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Reports are written to files only; skip GUI backend startup
 import matplotlib.pyplot as plt
 import logging
 
+from backtester import Trade
+from utils import PYARROW_AVAILABLE
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_equity_fig = None  # (Figure, Axes) reused across reports
+MAX_PLOT_POINTS = 4000  # Longer equity curves are strided down before plotting
+
+def _equity_axes():
+    """Shared equity-curve figure, cleared for the next report"""
+    global _equity_fig
+    if _equity_fig is None:
+        _equity_fig = plt.subplots(figsize=(12, 6))
+    fig, ax = _equity_fig
+    ax.cla()
+    return fig, ax
+
+def _trades_frame(trades) -> pd.DataFrame:
+    """Trades as a DataFrame built column by column (no per-trade dicts)"""
+    if hasattr(trades, 'to_frame'):  # Backtester's columnar TradeLog
+        return trades.to_frame()
+    # An empty list still gets Trade's header row
+    names = [f.name for f in dataclasses.fields(trades[0] if trades else Trade)]
+    cols = {name: [] for name in names}
+    for t in trades:
+        for name in names:
+            cols[name].append(getattr(t, name))
+    return pd.DataFrame(cols)
+
+def _write_csv(df: pd.DataFrame, path: str):
+    """Write df without its index, via Arrow's C++ CSV writer when pyarrow is installed
+
+    Arrow spells some values differently from pandas: integral floats lose
+    the trailing '.0' (100 vs 100.0) and booleans are lowercase (true vs
+    True). pd.read_csv parses both to the same values, but a column of
+    only integral floats reads back as int64 from Arrow's file.
+    """
+    if PYARROW_AVAILABLE:
+        # Hand Arrow the text pandas would write for categoricals and datetimes
+        # (no nanosecond suffix, NaT as empty) so both writers produce the same cells
+        text_cols = df.select_dtypes(include=['category', 'datetime', 'datetimetz']).columns
+        text = df.astype({c: str for c in text_cols})
+        for c in text_cols:
+            text[c] = text[c].where(df[c].notna(), None)
+        options = pacsv.WriteOptions(quoting_style='none', quoting_header='none')
+        try:
+            pacsv.write_csv(pa.Table.from_pandas(text, preserve_index=False), path, options)
+            return
+        except pa.ArrowInvalid:
+            pass  # A value needs quoting; let pandas handle it
+    df.to_csv(path, index=False, chunksize=100_000)
+
 def generate_report(results, file_prefix='backtest'):
     """Generate visual and CSV reports"""
     try:
         # 1. Save trades to CSV
-        trades_df = pd.DataFrame([t.__dict__ for t in results['trades']])
+        trades_df = _trades_frame(results['trades'])
         trades_csv = f'{file_prefix}_trades.csv'
-        trades_df.to_csv(trades_csv, index=False)
+        _write_csv(trades_df, trades_csv)
         
         # 2. Plot equity curve
-        plt.figure(figsize=(12, 6))
-        plt.plot(results['equity_curve'], label='Portfolio Value')
-        plt.title('Equity Curve')
-        plt.xlabel('Time')
-        plt.ylabel('Value ($)')
-        plt.grid(True)
+        fig, ax = _equity_axes()
+        equity = np.asarray(results['equity_curve'], dtype=np.float64)
+        step = max(1, len(equity) // MAX_PLOT_POINTS)
+        ax.plot(np.arange(0, len(equity), step), equity[::step], label='Portfolio Value')
+        ax.set_title('Equity Curve')
+        ax.set_xlabel('Time')
+        ax.set_ylabel('Value ($)')
+        ax.grid(True)
         equity_png = f'{file_prefix}_equity.png'
-        plt.savefig(equity_png)
-        plt.close()
+        fig.savefig(equity_png)
         
-        logger.info(f"Generated report files:\n- {trades_csv}\n- {equity_png}")
+        logger.info("Generated report files:\n- %s\n- %s", trades_csv, equity_png)
         return True
         
     except Exception as e:
-        logger.error(f"Report generation failed: {str(e)}")
+        logger.error("Report generation failed: %s", e)
         return False
\ No newline at end of file
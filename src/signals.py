@@ -1,6 +1,10 @@
+import logging
+import numpy as np
 import pandas as pd
 from typing import Optional, Tuple
 
+logger = logging.getLogger(__name__)
+
 def generate_signals(df: pd.DataFrame) -> Optional[Tuple[pd.DataFrame, dict]]:
     """
     Generate trading signals based on indicators.
@@ -12,36 +16,36 @@ def generate_signals(df: pd.DataFrame) -> Optional[Tuple[pd.DataFrame, dict]]:
         Tuple: (DataFrame with signals, statistics dictionary) or None if error
     """
     try:
-        print("\n🎯 Generating trading signals...")
-        
-        # Initialize signals (0=hold, 1=buy, -1=sell)
-        df['signal'] = 0
-        stats = {'buy': 0, 'sell': 0, 'hold': len(df)}
+        logger.debug("🎯 Generating trading signals...")
         
-        # 1. RSI Strategy (Overbought/Oversold)
-        df.loc[df['rsi'] < 30, 'signal'] = 1   # Buy when oversold
-        df.loc[df['rsi'] > 70, 'signal'] = -1  # Sell when overbought
+        rsi, macd, macd_signal, close, lower, upper = (
+            df[c].to_numpy() for c in ('rsi', 'macd', 'macd_signal', 'close', 'lower_band', 'upper_band')
+        )
         
-        # 2. MACD Crossover
-        df.loc[df['macd'] > df['signal'], 'signal'] = 1   # MACD above signal → Buy
-        df.loc[df['macd'] < df['signal'], 'signal'] = -1  # MACD below signal → Sell
+        # Signals (0=hold, 1=buy, -1=sell); first matching rule wins, so
+        # Bollinger overrides MACD, which overrides RSI
+        conditions = [
+            close < lower,        # 3. Price below lower band → Buy
+            close > upper,        # 3. Price above upper band → Sell
+            macd > macd_signal,   # 2. MACD above signal → Buy
+            macd < macd_signal,   # 2. MACD below signal → Sell
+            rsi < 30,             # 1. Buy when oversold
+            rsi > 70,             # 1. Sell when overbought
+        ]
+        signal = np.select(conditions, [1, -1, 1, -1, 1, -1], default=0)
+        df['signal'] = signal
         
-        # 3. Bollinger Band Strategy
-        df.loc[df['close'] < df['lower_band'], 'signal'] = 1    # Price below lower band → Buy
-        df.loc[df['close'] > df['upper_band'], 'signal'] = -1  # Price above upper band → Sell
+        # Update statistics (bincount bins: sell, hold, buy)
+        sell, hold, buy = np.bincount(signal + 1, minlength=3).tolist()
+        stats = {'buy': buy, 'sell': sell, 'hold': hold}
         
-        # Update statistics
-        stats['buy'] = len(df[df['signal'] == 1])
-        stats['sell'] = len(df[df['signal'] == -1])
-        stats['hold'] = len(df) - stats['buy'] - stats['sell']
-        
-        print("✅ Signals generated successfully")
-        print(f"📊 Signal counts: BUY={stats['buy']}, SELL={stats['sell']}, HOLD={stats['hold']}")
+        logger.debug("✅ Signals generated successfully")
+        logger.debug("📊 Signal counts: BUY=%d, SELL=%d, HOLD=%d", stats['buy'], stats['sell'], stats['hold'])
         
         return df, stats
         
     except Exception as e:
-        print(f"❌ Error generating signals: {e}")
+        logger.error("❌ Error generating signals: %s", e)
         return None
 
 # Test function
@@ -49,6 +53,8 @@ if __name__ == "__main__":
     from data_fetcher import get_crypto_data
     from indicators import calculate_indicators
     
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+
     print("\n🧪 Testing signal generation...")
     test_data = get_crypto_data(limit=100)
     if test_data is not None:
@@ -1,11 +1,49 @@
+import numpy as np
 import pandas as pd
+from utils import NUMBA_AVAILABLE, njit, rolling_mean
+
+@njit(cache=True)
+def _crossover_kernel(close, short_window, long_window):
+    """One pass with sliding sums: 1 where the short SMA is above the long SMA, -1 at or below,
+    0 during warm-up or while either window holds a NaN (as with rolling_mean)"""
+    n = close.shape[0]
+    signals = np.zeros(n, dtype=np.int8)
+    short_sum = 0.0
+    long_sum = 0.0
+    short_nans = 0
+    long_nans = 0
+    for i in range(n):
+        x = close[i]
+        if np.isnan(x):
+            short_nans += 1
+            long_nans += 1
+        else:
+            short_sum += x
+            long_sum += x
+        if i >= short_window:
+            x = close[i - short_window]
+            if np.isnan(x):
+                short_nans -= 1
+            else:
+                short_sum -= x
+        if i >= long_window:
+            x = close[i - long_window]
+            if np.isnan(x):
+                long_nans -= 1
+            else:
+                long_sum -= x
+        if i >= long_window - 1 and short_nans == 0 and long_nans == 0:
+            signals[i] = 1 if short_sum / short_window > long_sum / long_window else -1
+    return signals
 
 def moving_average_crossover(data: pd.DataFrame) -> pd.Series:
     """Simple moving average crossover strategy"""
     close = data['close'] if 'close' in data.columns else data['Close']
-    signals = pd.Series(0, index=data.index)
-    short_ma = close.rolling(10).mean()
-    long_ma = close.rolling(50).mean()
-    signals[short_ma > long_ma] = 1   # Buy signal
-    signals[short_ma <= long_ma] = -1 # Sell signal
-    return signals
\ No newline at end of file
+    close_arr = close.to_numpy()
+    if NUMBA_AVAILABLE:
+        return pd.Series(_crossover_kernel(close_arr.astype(np.float64), 10, 50), index=data.index)
+    short_ma = rolling_mean(close_arr, 10)
+    long_ma = rolling_mean(close_arr, 50)
+    # Buy (1) above, sell (-1) at or below; NaN warm-up bars fail both and hold (0)
+    signals = np.select([short_ma > long_ma, short_ma <= long_ma], [1, -1], 0).astype(np.int8)
+    return pd.Series(signals, index=data.index)
\ No newline at end of file
@@ -1 +1,47 @@
+import numpy as np
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit so kernels still run as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401  (CSV fast paths in main and reporting)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """Trailing SMA; NaN for the first window-1 bars and for any window holding a NaN.
+
+    Uses bottleneck.move_mean when installed, else cumulative sums; both
+    match pandas' rolling(window).mean().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if BOTTLENECK_AVAILABLE and 0 < window <= values.shape[0]:
+        return bn.move_mean(values, window)
+    out = np.full(values.shape[0], np.nan)
+    if 0 < window <= values.shape[0]:
+        missing = np.isnan(values)
+        c = np.cumsum(np.insert(np.where(missing, 0.0, values), 0, 0.0))
+        m = np.cumsum(np.insert(missing, 0, False))
+        means = (c[window:] - c[:-window]) / window
+        means[(m[window:] - m[:-window]) > 0] = np.nan
+        out[window - 1:] = means
+    return out
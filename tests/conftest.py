@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# Modules in src/ import each other by bare name (e.g. `from utils import njit`)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
+
+
+@pytest.fixture
+def flag_off(monkeypatch):
+    """flag_off(module, 'NUMBA_AVAILABLE') forces an optional-dependency flag False for the rest of the test"""
+    def _off(module, flag: str):
+        monkeypatch.setattr(module, flag, False)
+    return _off
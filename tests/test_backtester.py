@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import (Backtester, _run_backtest_core, _run_backtest_vectorized)
+from strategies import moving_average_crossover
+
+# Pure-Python body of the kernel (the function itself when Numba is missing)
+_core_py = getattr(_run_backtest_core, 'py_func', _run_backtest_core)
+
+
+def _random_case(rng):
+    n = int(rng.integers(0, 500))
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    signals = rng.choice(np.array([-1, 0, 1], dtype=np.int8), n, p=[0.1, 0.7, 0.2])
+    params = (10000.0, 0.001, float(rng.uniform(0.01, 0.1)),
+              float(rng.uniform(0.01, 0.2)), float(rng.uniform(0.1, 1.0)))
+    return (prices, signals) + params
+
+
+def _assert_same(expected, got, rtol):
+    for want, have in zip(expected, got):
+        assert want.dtype == have.dtype and want.shape == have.shape
+        if want.dtype.kind in 'iu':
+            np.testing.assert_array_equal(have, want)
+        else:
+            np.testing.assert_allclose(have, want, rtol=rtol, atol=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_kernel_and_vectorized_paths_agree(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(200):
+        case = _random_case(rng)
+        expected = _core_py(*case)
+        # Compiled kernel is the same loop, so it should match bit for bit
+        _assert_same(expected, _run_backtest_core(*case), rtol=0)
+        # Vectorized path threads cash with a cumprod; same trades, rounding-level differences
+        _assert_same(expected, _run_backtest_vectorized(*case), rtol=1e-9)
+
+
+def test_open_position_and_no_trades():
+    prices = np.array([100.0, 101.0, 102.0, 103.0])
+    hold = np.zeros(4, dtype=np.int8)
+    buy_and_hold = np.array([0, 1, 0, 0], dtype=np.int8)
+    for signals in (hold, buy_and_hold):
+        case = (prices, signals, 10000.0, 0.001, 0.5, 0.5, 0.5)
+        _assert_same(_core_py(*case), _run_backtest_vectorized(*case), rtol=1e-12)
+
+
+def _frame(n=120):
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))})
+
+
+def test_signal_length_mismatch_raises():
+    data = _frame()
+    with pytest.raises(ValueError, match="60 signals for 120"):
+        Backtester(data, moving_average_crossover, signals=np.ones(60)).run_backtest()
+
+
+def test_signal_series_is_aligned_to_the_frame_index():
+    data = _frame()
+    aligned = Backtester(data, moving_average_crossover).run_backtest()['metrics']
+    shuffled = moving_average_crossover(data).sample(frac=1, random_state=0)
+    assert Backtester(data, moving_average_crossover, signals=shuffled).run_backtest()['metrics'] == aligned
+
+
+def test_reassigning_data_drops_cached_signals():
+    bt = Backtester(_frame(), moving_average_crossover)
+    bt.run_backtest()
+    bt.data = _frame(80)
+    assert bt.signals is None
+    assert bt.run_backtest()['equity_curve'].shape == (80,)
+
+
+class _ScanCounter(np.ndarray):
+    """Price array that counts the bars read through slices"""
+    scanned = 0
+
+    def __getitem__(self, key):
+        out = super().__getitem__(key)
+        if isinstance(key, slice):
+            _ScanCounter.scanned += np.asarray(out).shape[0]
+        return out
+
+
+def test_buy_only_signals_scan_linearly():
+    # Sells never fire, so every exit is a stop-loss/take-profit; the scan must
+    # stop at the breach, not run on to the end of the series for each trade
+    rng = np.random.default_rng(11)
+    n = 20000
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    signals = np.ones(n, dtype=np.int8)
+    case = (prices, signals, 10000.0, 0.001, 0.01, 0.01, 0.5)
+    expected = _core_py(*case)
+    assert expected[0].shape[0] > 1000
+
+    _ScanCounter.scanned = 0
+    got = _run_backtest_vectorized(prices.view(_ScanCounter), *case[1:])
+    _assert_same(expected, got, rtol=1e-9)
+    assert _ScanCounter.scanned < 5 * n
@@ -0,0 +1,167 @@
+import logging
+
+import numpy as np
+import pytest
+
+from backtester import DEXBacktester, LPTokenView
+
+
+def _dex(*users, lp="alice"):
+    """10 ETH / 20000 USDC pool seeded by lp; lp and each user start with 100 ETH and 200000 USDC"""
+    dex = DEXBacktester()
+    for user in (lp, *users):
+        dex.deposit(user, "ETH", 100)
+        dex.deposit(user, "USDC", 200000)
+    dex.provide_liquidity(lp, "ETH", "USDC", 10, 20000)
+    return dex
+
+
+def test_fork_flagged_after_first_swap_blocks_later_swaps():
+    dex = _dex()
+    dex.safe_swap("alice", "ETH", "USDC", 1)
+    address = dex.amm.get_pool("ETH", "USDC").address
+    dex.add_known_fork(address[:8], "Copycat", "Uniswap V2", 0.9)
+    with pytest.raises(ValueError, match="fork"):
+        dex.safe_swap("alice", "ETH", "USDC", 1)
+
+
+def test_fork_flagged_through_the_detector_blocks_later_swaps():
+    dex = _dex()
+    dex.safe_swap("alice", "ETH", "USDC", 1)
+    address = dex.amm.get_pool("ETH", "USDC").address
+    dex.fork_detector.add_known_fork(address[:8], "Copycat", "Uniswap V2", 0.9)
+    with pytest.raises(ValueError, match="fork"):
+        dex.safe_swap("alice", "ETH", "USDC", 1)
+    with pytest.raises(ValueError, match="fork"):
+        dex.safe_swap_batch(["alice"], ["ETH"], ["USDC"], [1])
+
+
+def test_clear_fork_cache_picks_up_direct_table_edits():
+    dex = _dex()
+    dex.safe_swap("alice", "ETH", "USDC", 1)
+    address = dex.amm.get_pool("ETH", "USDC").address
+    dex.fork_detector.known_forks[address[:8].lower()] = ("Copycat", "Uniswap V2", 0.9)
+    dex.clear_fork_cache()
+    with pytest.raises(ValueError, match="fork"):
+        dex.safe_swap("alice", "ETH", "USDC", 1)
+
+
+def test_safe_swap_batch_matches_sequential_safe_swap():
+    swaps = [("alice", "ETH", "USDC", 1.0), ("bob", "USDC", "ETH", 3000.0),
+             ("alice", "USDC", "ETH", 500.0), ("bob", "ETH", "USDC", 2.0)]
+    one_by_one, batched = _dex("bob"), _dex("bob")
+    expected = [one_by_one.safe_swap(*swap) for swap in swaps]
+    got = batched.safe_swap_batch(*zip(*swaps))
+    assert got.tolist() == expected
+    for user in ("alice", "bob"):
+        assert batched.get_balances(user) == one_by_one.get_balances(user)
+    assert batched.amm.get_pool("ETH", "USDC").reserves == one_by_one.amm.get_pool("ETH", "USDC").reserves
+
+
+def test_safe_swap_batch_can_spend_tokens_received_earlier_in_the_batch():
+    dex = _dex(lp="lp")
+    dex.deposit("carol", "ETH", 1)
+    received = dex.safe_swap_batch(["carol", "carol"], ["ETH", "USDC"], ["USDC", "ETH"], [1, 1000])
+    assert dex.get_balances("carol")["USDC"] == pytest.approx(received[0] - 1000)
+
+
+def test_failed_safe_swap_batch_leaves_state_untouched():
+    dex = _dex()
+    reserves = dex.amm.get_pool("ETH", "USDC").reserves
+    balances = dex.get_balances("alice")
+    with pytest.raises(ValueError, match="Insufficient ETH"):
+        dex.safe_swap_batch(["alice", "alice", "dave"], ["ETH", "ETH", "ETH"], ["USDC"] * 3, [1, 1, 1])
+    assert dex.amm.get_pool("ETH", "USDC").reserves == reserves
+    assert dex.get_balances("alice") == balances
+    assert dex.get_balances("dave") == {}
+
+
+def test_zero_amount_calls_from_unseen_users():
+    dex = _dex()
+    assert dex.safe_swap("new_user", "ETH", "USDC", 0) == 0.0
+    dex.provide_liquidity("other_user", "ETH", "USDC", 0, 0)
+    assert dex.get_balances("new_user") == {"ETH": 0.0, "USDC": 0.0}
+    assert dex.get_lp_positions("other_user") == {}
+
+
+def test_safe_swap_batch_rejects_ragged_inputs():
+    dex = _dex()
+    reserves = dex.amm.get_pool("ETH", "USDC").reserves
+    with pytest.raises(ValueError, match="differ in length"):
+        dex.safe_swap_batch(["alice"], ["ETH", "ETH"], ["USDC", "USDC"], [1, 1])
+    assert dex.amm.get_pool("ETH", "USDC").reserves == reserves
+
+
+def test_balance_matrix_grows_geometrically():
+    dex = DEXBacktester()
+    reallocations, matrix = 0, dex._bal
+    for i in range(1000):
+        dex.deposit(f"user{i}", "ETH", i)
+        if dex._bal is not matrix:
+            reallocations, matrix = reallocations + 1, dex._bal
+    assert reallocations <= 10
+    assert dex.get_balances("user999") == {"ETH": 999.0}
+    assert dex.get_balances("user0") == {"ETH": 0.0}
+
+
+@pytest.mark.parametrize("amounts", [(0, 0), (10, 0), (-1, 5)])
+def test_new_pool_rejects_non_positive_amounts(amounts):
+    dex = DEXBacktester()
+    dex.deposit("alice", "ETH", 100)
+    dex.deposit("alice", "USDC", 100)
+    with pytest.raises(ValueError, match="must be positive"):
+        dex.provide_liquidity("alice", "ETH", "USDC", *amounts)
+    assert dex.amm.num_pools == 0
+    assert dex.get_balances("alice") == {"ETH": 100.0, "USDC": 100.0}
+
+
+def test_mint_matches_uniswap_v2_shares():
+    dex = _dex()
+    lp_before = dex.get_lp_positions("alice")["ETH-USDC"]
+    assert lp_before == pytest.approx((10 * 20000) ** 0.5)
+    dex.provide_liquidity("alice", "USDC", "ETH", 2000, 1)  # Reversed order routes to the same pool
+    assert dex.get_lp_positions("alice")["ETH-USDC"] == pytest.approx(lp_before * 1.1)
+
+
+def test_swap_skips_debug_formatting_when_debug_is_off(monkeypatch, caplog):
+    dex = _dex()
+    def _fail(self):
+        raise AssertionError("reserves read with DEBUG disabled")
+    monkeypatch.setattr(LPTokenView, "reserves", property(_fail))
+    caplog.set_level(logging.INFO, logger="backtester")
+    assert dex.safe_swap("alice", "ETH", "USDC", 1) > 0
+
+
+def test_lp_token_view_repr_shows_pool_state():
+    dex = _dex()
+    view = dex.amm.get_pool("ETH", "USDC")
+    text = repr(view)
+    assert text.startswith("LPTokenView(pair='ETH-USDC', ")
+    for value in (view.address, view.reserves, view.total_supply, view.fee_accumulated):
+        assert repr(value) in text
+
+
+def test_deposit_batch_accumulates_duplicate_rows():
+    batched, looped = DEXBacktester(), DEXBacktester()
+    rows = [("alice", "ETH", 1.5), ("bob", "USDC", 100), ("alice", "ETH", 2.5),
+            ("alice", "USDC", 10), ("alice", "ETH", 1.0)]
+    batched.deposit_batch(*zip(*rows))
+    for row in rows:
+        looped.deposit(*row)
+    assert batched.get_balances("alice") == {"ETH": 5.0, "USDC": 10.0}
+    for user in ("alice", "bob"):
+        assert batched.get_balances(user) == looped.get_balances(user)
+
+
+@pytest.mark.parametrize("token_in, token_out", [("ETH", "USDC"), ("USDC", "ETH")])
+def test_simulate_batch_quotes_match_execute_swap_without_state_change(token_in, token_out):
+    dex = _dex()
+    amounts = np.array([0.5, 1.0, 2.5, 1000.0])
+    before = dex.amm.snapshot()
+    quotes = dex.amm.simulate_batch(token_in, token_out, amounts)
+    for now, saved in zip(dex.amm.snapshot(), before):
+        np.testing.assert_array_equal(now, saved)
+
+    for amount, quote in zip(amounts, quotes):
+        fresh = _dex()
+        assert fresh.amm.execute_swap(token_in, token_out, amount)[0] == pytest.approx(quote, rel=1e-12)
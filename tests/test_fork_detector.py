@@ -0,0 +1,38 @@
+import dataclasses
+
+import pytest
+
+from fork_detector import ForkDetector
+
+
+def test_known_prefixes():
+    detector = ForkDetector()
+    assert detector.is_vampire_fork("0x795065dcc9f64b5614c407a6efdc400da6221fb0")
+    assert not detector.is_vampire_fork("0xB4E16D0168e52d35cacd2c6185b44281ec28c9dc")
+    assert detector.query_pool("0x1234567890").name == "unknown"
+
+
+def test_added_fork_prefix_takes_effect_after_a_lookup():
+    detector = ForkDetector()
+    address = "0xabcdef0000000000000000000000000000000000"
+    assert not detector.is_vampire_fork(address)
+    detector.add_known_fork("0xabcdef", "Copycat", "Uniswap V2", 0.9)
+    assert detector.is_vampire_fork(address)
+    assert detector.query_pool(address).original_protocol == "Uniswap V2"
+
+
+def test_refresh_picks_up_direct_table_edits():
+    detector = ForkDetector()
+    address = "0x1111110000000000000000000000000000000000"
+    assert not detector.is_vampire_fork(address)
+    detector.known_forks["0x111111"] = ("Copycat", "Uniswap V2", 0.5)
+    detector.refresh()
+    assert detector.is_vampire_fork(address)
+
+
+def test_cached_metadata_is_immutable():
+    detector = ForkDetector()
+    metadata = detector.query_pool("0x795065dcc9f64b5614c407a6efdc400da6221fb0")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        metadata.risk_score = 9
+    assert detector.query_pool("0x795065dcc9f64b5614c407a6efdc400da6221fb0").risk_score == 0.9
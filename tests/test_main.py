@@ -0,0 +1,32 @@
+import os
+
+import pandas as pd
+import pytest
+
+import main
+from main import load_data
+
+SAMPLE = os.path.join(os.path.dirname(__file__), os.pardir, 'src', 'data.csv')
+
+
+def _read_both(path, flag_off):
+    from_arrow = load_data(str(path))
+    flag_off(main, 'PYARROW_AVAILABLE')
+    return from_arrow, load_data(str(path))
+
+
+def test_arrow_reader_matches_pandas_on_the_sample_data(flag_off):
+    pytest.importorskip('pyarrow')
+    from_arrow, from_pandas = _read_both(SAMPLE, flag_off)
+    pd.testing.assert_frame_equal(from_arrow, from_pandas)
+
+
+def test_arrow_reader_keeps_temporal_columns_as_text(tmp_path, flag_off):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'prices.csv'
+    path.write_text('date,timestamp,close,volume,symbol\n'
+                    '2024-01-01,2024-01-01 09:30:00,100.5,10,ETH\n'
+                    '2024-01-02,,101.0,,\n')
+    from_arrow, from_pandas = _read_both(path, flag_off)
+    pd.testing.assert_frame_equal(from_arrow, from_pandas)
+    assert from_arrow['date'].tolist() == ['2024-01-01', '2024-01-02']
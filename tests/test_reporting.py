@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import reporting
+
+from backtester import Backtester, Trade, TradeLog
+from reporting import _trades_frame, _write_csv
+from strategies import moving_average_crossover
+
+HEADER = 'entry_time,exit_time,entry_price,exit_price,size,fees,pnl,exit_reason\n'
+
+
+def test_empty_trade_list_writes_the_header(tmp_path):
+    path = tmp_path / 'trades.csv'
+    _write_csv(_trades_frame([]), str(path))
+    assert path.read_text() == HEADER
+
+
+def test_trade_log_and_trade_list_export_the_same_rows():
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.03, 300)))})
+    trades = Backtester(data, moving_average_crossover, stop_loss=0.03, take_profit=0.05).run_backtest()['trades']
+    assert isinstance(trades, TradeLog) and len(trades) > 0
+    as_list = list(trades)
+    assert all(isinstance(t, Trade) for t in as_list)
+    expected = pd.DataFrame([t.__dict__ for t in as_list]).to_csv(index=False)
+    assert _trades_frame(trades).to_csv(index=False) == expected
+    assert _trades_frame(as_list).to_csv(index=False) == expected
+
+
+def _mixed_frame():
+    times = pd.date_range('2024-01-01 09:30', periods=4, freq='h')
+    return pd.DataFrame({
+        'entry_time': times.where([True, True, False, True]),          # NaT writes as empty
+        'stamp_utc': times.tz_localize('UTC'),
+        'price': [101.25, np.nan, 0.5, 3.0625],
+        'size': [1, 2, 3, 4],
+        'exit_reason': pd.Categorical(['signal', 'stop_loss', 'take_profit', 'signal']),
+        'note': ['a', 'b c', '', 'd'],
+    })
+
+
+def _write_both(df, tmp_path, flag_off):
+    arrow_path, pandas_path = tmp_path / 'arrow.csv', tmp_path / 'pandas.csv'
+    _write_csv(df, str(arrow_path))
+    flag_off(reporting, 'PYARROW_AVAILABLE')
+    _write_csv(df, str(pandas_path))
+    return arrow_path.read_text(), pandas_path.read_text()
+
+
+def test_arrow_and_pandas_writers_produce_the_same_text(tmp_path, flag_off):
+    pytest.importorskip('pyarrow')
+    arrow_text, pandas_text = _write_both(_mixed_frame(), tmp_path, flag_off)
+    assert arrow_text == pandas_text
+
+
+def test_arrow_writer_spelling_differences_read_back_equal(tmp_path, flag_off):
+    pytest.importorskip('pyarrow')
+    df = pd.DataFrame({'pnl': [100.0, -2.0], 'win': [True, False]})
+    arrow_text, pandas_text = _write_both(df, tmp_path, flag_off)
+    assert arrow_text != pandas_text  # 100 vs 100.0, true vs True
+    from_arrow, from_pandas = pd.read_csv(tmp_path / 'arrow.csv'), pd.read_csv(tmp_path / 'pandas.csv')
+    assert from_arrow['pnl'].dtype == np.int64 and from_pandas['pnl'].dtype == np.float64
+    pd.testing.assert_frame_equal(from_arrow, from_pandas, check_dtype=False)
+
+
+def test_values_that_need_quoting_fall_back_to_pandas(tmp_path, flag_off):
+    pytest.importorskip('pyarrow')
+    df = pd.DataFrame({'note': ['a,b', 'say "hi"'], 'x': [0.25, 0.75]})
+    arrow_text, pandas_text = _write_both(df, tmp_path, flag_off)
+    assert arrow_text == pandas_text
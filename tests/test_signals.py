@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from signals import generate_signals
+
+
+def _frame():
+    # One row per rule, plus rows where a higher-priority rule must win
+    return pd.DataFrame({
+        'close':       [100,   90,  110,  100,  100,  100,  100,  100,    90, 100],
+        'lower_band':  [ 95,   95,   95,   95,   95,   95,   95,   95,    95,  95],
+        'upper_band':  [105,  105,  105,  105,  105,  105,  105,  105,   105, 105],
+        'macd':        [  0,   -1,    1,    1,   -1,    0,    0,   -1,     0, np.nan],
+        'macd_signal': [  0,    0,    0,    0,    0,    0,    0,    0,     0, np.nan],
+        'rsi':         [ 50,   80,   20,   80,   20,   20,   80,   50,    50, np.nan],
+    })
+
+
+def test_bollinger_overrides_macd_which_overrides_rsi():
+    df, stats = generate_signals(_frame())
+    #                                hold band band macd macd rsi rsi macd band NaN
+    assert df['signal'].tolist() == [0,   1,   -1,  1,   -1,  1,  -1, -1,  1,   0]
+    assert stats == {'buy': 4, 'sell': 4, 'hold': 2}
+
+
+def test_macd_rule_reads_the_macd_signal_line_not_the_signal_column():
+    df = _frame()
+    df['signal'] = 1000.0  # Stale column: must be ignored and overwritten
+    expected = generate_signals(_frame())[0]['signal'].tolist()
+    out, _ = generate_signals(df)
+    assert out['signal'].tolist() == expected
+    assert out['signal'].dtype.kind == 'i'
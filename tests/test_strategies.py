@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategies
+
+
+@pytest.fixture(params=[True, False], ids=['kernel', 'numpy'])
+def crossover(request, flag_off):
+    """moving_average_crossover through the Numba kernel and the NumPy fallback"""
+    if not request.param:
+        flag_off(strategies, 'NUMBA_AVAILABLE')
+    return strategies.moving_average_crossover
+
+
+def _baseline(close: pd.Series) -> np.ndarray:
+    short_ma, long_ma = close.rolling(10).mean(), close.rolling(50).mean()
+    return np.select([short_ma > long_ma, short_ma <= long_ma], [1, -1], 0)
+
+
+@pytest.mark.parametrize('nan_bars', [[], [100], [5, 60, 61, 299]])
+def test_crossover_matches_rolling_baseline(crossover, nan_bars):
+    rng = np.random.default_rng(1)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300))))
+    close[nan_bars] = np.nan
+    data = pd.DataFrame({'close': close})
+    signals = crossover(data)
+    assert signals.dtype == np.int8
+    np.testing.assert_array_equal(signals.to_numpy(), _baseline(close))
+
+
+def test_crossover_paths_agree_on_random_walks(flag_off):
+    rng = np.random.default_rng(2)
+    frames = []
+    for _ in range(50):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, int(rng.integers(0, 400)))))
+        close[rng.random(close.shape[0]) < 0.01] = np.nan
+        frames.append(pd.DataFrame({'close': close}))
+    kernel = [strategies.moving_average_crossover(data) for data in frames]
+    flag_off(strategies, 'NUMBA_AVAILABLE')
+    for data, expected in zip(frames, kernel):
+        np.testing.assert_array_equal(strategies.moving_average_crossover(data).to_numpy(), expected.to_numpy())
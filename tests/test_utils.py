@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+
+
+@pytest.fixture(params=[True, False], ids=['default', 'cumsum'])
+def rolling_mean(request, flag_off):
+    """utils.rolling_mean as installed, and with the bottleneck path forced off"""
+    if not request.param:
+        flag_off(utils, 'BOTTLENECK_AVAILABLE')
+    return utils.rolling_mean
+
+
+@pytest.mark.parametrize('window', [1, 10, 50])
+def test_rolling_mean_matches_pandas_with_nans(rolling_mean, window):
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 5, 300)
+    values[[3, 100, 101, 250]] = np.nan
+    expected = pd.Series(values).rolling(window).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean(values, window), expected, rtol=1e-9)
+
+
+def test_rolling_mean_window_longer_than_input(rolling_mean):
+    assert np.isnan(rolling_mean(np.arange(5.0), 10)).all()